@@ -0,0 +1,287 @@
+"""
+red_wizard_cache.py
+
+This module provides a local, content-addressed cache for generated rosters. A roster is keyed by
+a hash of its generation parameters (number of wizards, level and random seed) together with the
+contents of the data files, the HTML template and the generator code, so that a change to any of
+them produces a new key rather than a stale hit.
+
+Each cache entry is a directory named after its key holding one artifact per output format
+(red_wizards.json, red_wizards.html, ...) and a manifest of their digests. Artifacts are restored
+with a hard link where the file system allows it and a file copy otherwise. Because a restored
+output may share its contents with the cache, every artifact is checked against its digest before
+it is restored, and an entry that has been changed since it was stored is evicted. The cache
+directory is capped in size and the least recently used entries are evicted first. Hit and miss
+counts and the number of bytes served from the cache are kept in stats.json inside the cache
+directory.
+
+Every file is written to a uniquely named temporary file and moved into place, so several runs
+can share one cache directory.
+
+Only seeded rosters are cacheable: without a seed every run is meant to produce new wizards.
+
+Example usage:
+
+    from red_wizard_cache import RosterCache, cache_key
+
+    cache = RosterCache(".red_wizard_cache")
+    key = cache_key(10, None, 42)
+    if not cache.restore(key, "json", "red_wizards.json"):
+        ...  # generate red_wizards.json
+        cache.store(key, "json", "red_wizards.json")
+"""
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+DEFAULT_CACHE_DIR = ".red_wizard_cache"
+DEFAULT_MAX_BYTES = 100 * 1024 * 1024
+
+# Bump when the layout of the cache directory or the key derivation changes.
+CACHE_VERSION = 2
+
+MODULE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Files whose contents determine the generated artifacts. The data files are read from the
+# working directory, as red_wizards_utils does; the template and code live next to this module.
+KEY_FILES = [
+    "values.json",
+    "wizard_spell_lists.json",
+    os.path.join(MODULE_DIR, "red_wizard_template.html"),
+    os.path.join(MODULE_DIR, "red_wizard_generator.py"),
+    os.path.join(MODULE_DIR, "red_wizard_sinks.py"),
+    os.path.join(MODULE_DIR, "red_wizard_to_html.py"),
+    os.path.join(MODULE_DIR, "red_wizards_utils.py"),
+]
+
+STATS_FILE = "stats.json"
+MANIFEST_FILE = "manifest.json"
+
+
+def file_digest(path):
+    """
+    Calculate the SHA-256 digest of a file's contents.
+
+    :param path: The path of the file to hash.
+    :return: The hexadecimal digest of the file.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as infile:
+        for block in iter(lambda: infile.read(64 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(num_wizards, level, seed):
+    """
+    Calculate the cache key for a roster.
+
+    :param num_wizards: The number of Red Wizards in the roster.
+    :param level: The level of the Red Wizards, or None for random levels.
+    :param seed: The random seed the roster is generated with.
+    :return: A hexadecimal string identifying the roster.
+    """
+    key_data = {
+        "version": CACHE_VERSION,
+        "num_wizards": num_wizards,
+        "level": level,
+        "seed": seed,
+        "files": {os.path.basename(path): file_digest(path) for path in KEY_FILES},
+    }
+    return hashlib.sha256(json.dumps(key_data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def temporary_path(target):
+    """
+    Create an empty, uniquely named temporary file next to a target path.
+
+    The temporary file is on the same file system as the target, so it can be moved into place
+    with os.replace, and its unique name keeps concurrent writers of the same target apart.
+
+    :param target: The path the temporary file will replace.
+    :return: The path of the temporary file.
+    """
+    descriptor, path = tempfile.mkstemp(
+        dir=os.path.dirname(target) or ".", prefix=f".{os.path.basename(target)}.",
+        suffix=".tmp")
+    os.close(descriptor)
+    return path
+
+
+def replace_with_json(data, target):
+    """
+    Atomically replace a file with the JSON encoding of some data.
+
+    :param data: The data to encode.
+    :param target: The path of the file to replace.
+    """
+    temporary = temporary_path(target)
+    try:
+        with open(temporary, "w", encoding="utf-8") as outfile:
+            json.dump(data, outfile, indent=2)
+        os.replace(temporary, target)
+    except BaseException:
+        os.remove(temporary)
+        raise
+
+
+def link_or_copy(source, destination):
+    """
+    Place a file at the destination path with a hard link, falling back to a copy.
+
+    The destination is replaced atomically, so a reader never sees a partially written file.
+
+    :param source: The path of the existing file.
+    :param destination: The path to place the file at.
+    """
+    if os.path.exists(destination) and os.path.samefile(source, destination):
+        return
+    directory = os.path.dirname(destination)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # os.link cannot overwrite an existing file, so the link is made in a private directory.
+    temporary_dir = tempfile.mkdtemp(dir=directory or ".", prefix=".link.", suffix=".tmp")
+    temporary = os.path.join(temporary_dir, os.path.basename(destination))
+    try:
+        try:
+            os.link(source, temporary)
+        except OSError:
+            shutil.copyfile(source, temporary)
+        os.replace(temporary, destination)
+    finally:
+        shutil.rmtree(temporary_dir, ignore_errors=True)
+
+
+class RosterCache:
+    """
+    A size-capped, least recently used cache of roster artifacts.
+
+    :param directory: The cache directory, created on first use.
+    :param max_bytes: The maximum total size of the cache entries, including their manifests.
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+
+    def _artifact_path(self, key, fmt):
+        return os.path.join(self.directory, key, f"red_wizards.{fmt}")
+
+    def _read_manifest(self, key):
+        try:
+            with open(os.path.join(self.directory, key, MANIFEST_FILE), encoding="utf-8") as infile:
+                return json.load(infile)
+        except (OSError, ValueError):
+            return {}
+
+    def restore(self, key, fmt, destination):
+        """
+        Restore a cached artifact to the destination path.
+
+        :param key: The roster's cache key, see cache_key.
+        :param fmt: The output format of the artifact (e.g. "json" or "html").
+        :param destination: The path to restore the artifact to.
+        :return: True if the artifact was cached and restored, False otherwise.
+        """
+        artifact = self._artifact_path(key, fmt)
+        if not os.path.isfile(artifact):
+            self._record(hit=False)
+            return False
+
+        # A hard linked output written in place also changes the cached artifact, so an artifact
+        # that no longer matches its stored digest is treated as a miss and its entry evicted.
+        if self._read_manifest(key).get(fmt) != file_digest(artifact):
+            shutil.rmtree(os.path.join(self.directory, key), ignore_errors=True)
+            self._record(hit=False)
+            return False
+
+        try:
+            link_or_copy(artifact, destination)
+            # The entry's modification time is its last use, which eviction relies on.
+            os.utime(os.path.join(self.directory, key))
+        except FileNotFoundError:
+            # Another run evicted the entry while it was being restored.
+            self._record(hit=False)
+            return False
+        self._record(hit=True, bytes_saved=os.path.getsize(artifact))
+        return True
+
+    def store(self, key, fmt, source):
+        """
+        Copy a generated artifact into the cache and evict old entries if the cache is too large.
+
+        The artifact is copied rather than linked, so that later changes to the source file
+        cannot alter the cached copy, and its digest is recorded so that restore can detect
+        changes made through a hard linked output.
+
+        :param key: The roster's cache key, see cache_key.
+        :param fmt: The output format of the artifact (e.g. "json" or "html").
+        :param source: The path of the generated artifact.
+        """
+        artifact = self._artifact_path(key, fmt)
+        entry = os.path.dirname(artifact)
+        os.makedirs(entry, exist_ok=True)
+        temporary = temporary_path(artifact)
+        try:
+            shutil.copyfile(source, temporary)
+            os.replace(temporary, artifact)
+        except BaseException:
+            os.remove(temporary)
+            raise
+
+        manifest = self._read_manifest(key)
+        manifest[fmt] = file_digest(artifact)
+        replace_with_json(manifest, os.path.join(entry, MANIFEST_FILE))
+
+        os.utime(entry)
+        self.evict()
+
+    def evict(self):
+        """
+        Remove the least recently used entries until the cache fits within max_bytes.
+        """
+        entries = []
+        total_bytes = 0
+        for entry in os.scandir(self.directory):
+            if not entry.is_dir():
+                continue
+            try:
+                size = sum(artifact.stat().st_size for artifact in os.scandir(entry.path))
+                entries.append((entry.stat().st_mtime, size, entry.path))
+            except FileNotFoundError:
+                # Another run evicted the entry while it was being measured.
+                continue
+            total_bytes += size
+
+        for _, size, path in sorted(entries):
+            if total_bytes <= self.max_bytes:
+                break
+            shutil.rmtree(path, ignore_errors=True)
+            total_bytes -= size
+
+    def _record(self, hit, bytes_saved=0):
+        stats = self.stats()
+        stats["hits" if hit else "misses"] += 1
+        stats["bytes_saved"] += bytes_saved
+        del stats["hit_ratio"]
+        os.makedirs(self.directory, exist_ok=True)
+        replace_with_json(stats, os.path.join(self.directory, STATS_FILE))
+
+    def stats(self):
+        """
+        Return the cache's lifetime statistics.
+
+        :return: A dictionary with the number of "hits" and "misses", the "hit_ratio" and the
+            number of "bytes_saved" by serving artifacts from the cache.
+        """
+        stats = {"hits": 0, "misses": 0, "bytes_saved": 0}
+        try:
+            with open(os.path.join(self.directory, STATS_FILE), encoding="utf-8") as infile:
+                stats.update(json.load(infile))
+        except (OSError, ValueError):
+            pass
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_ratio"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
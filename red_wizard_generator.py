@@ -6,91 +6,146 @@ spellcasters in the Dungeons & Dragons universe. The module includes functions f
 random ability scores, character levels, skill bonuses, saving throws, and other attributes
 specific to Red Wizards.
 
-The main function, `generate_red_wizards`, takes the number of wizards to generate and an optional
-level range as input, and returns a list of dictionaries containing the generated wizards' 
-attributes.
+Functions:
+- generate_wizard(level): generate a single wizard as a dictionary of attributes.
+- generate_red_wizards(num_wizards, level): yield that many wizards one at a time. All wizards
+  share the given level, or each gets a random level if it is not specified.
+- main(num_wizards, level, outputs, seed, cache): generate the wizards and write them to every
+  output spec (see red_wizard_sinks) in a single pass. A seed makes the run reproducible, and
+  a red_wizard_cache.RosterCache serves seeded outputs that were generated before.
 
 Example usage:
 
-    from red_wizard_generator import generate_red_wizards
+    from red_wizard_generator import generate_red_wizards, main
 
     # Generate 10 random Red Wizards
-    wizards = generate_red_wizards(10)
+    wizards = list(generate_red_wizards(10))
 
-    # Generate 5 Red Wizards with levels between 5 and 15
-    wizards = generate_red_wizards(5, (5, 15))
+    # Generate 5 level 15 Red Wizards
+    wizards = list(generate_red_wizards(5, 15))
+
+    # Write 20 Red Wizards to JSON Lines and CSV, generating the same wizards on every run
+    main(20, outputs=["roster.jsonl", "roster.csv"], seed=42)
 """
 import argparse
-import json
+import random
+import red_wizard_cache
+import red_wizard_sinks
 import red_wizards_utils
 
-def main(num_wizards, level=None):
+DEFAULT_OUTPUT = "red_wizards.json"
+
+def generate_wizard(level=None):
+    """
+    Generate a single Red Wizard of Thay.
+
+    :param level: The level of the Red Wizard. If not specified, a random level will be 
+    generated.
+    :return: A dictionary containing the generated wizard's attributes.
+    """
+    wizard = {}
+    wizard["name"] = red_wizards_utils.generate_thayan_name()
+    if level is None:
+        wizard["level"] = red_wizards_utils.generate_random_level()
+    else:
+        wizard["level"] = level
+    wizard["race"] = red_wizards_utils.generate_race()
+    wizard["living_status"] = red_wizards_utils.generate_living_status()
+    wizard["arcane_tradition"] = red_wizards_utils.generate_arcane_tradition()
+    if wizard["living_status"] == "living":
+        wizard["age"] = red_wizards_utils.generate_age()
+    wizard["alignment"] = red_wizards_utils.generate_alignment()
+    wizard["ability_scores"] = red_wizards_utils.generate_ability_scores(wizard["level"])
+    wizard["ability_modifiers"] = red_wizards_utils.generate_ability_modifiers(
+        wizard["ability_scores"])
+    wizard["armor_class"] = 10 + wizard["ability_modifiers"]["dex_modifier"]
+    wizard["hit_points"] = red_wizards_utils.calculate_hit_points(
+        wizard["level"], wizard["ability_scores"]["CON"])
+    wizard["proficiency_bonus"] = red_wizards_utils.calculate_proficiency_bonus(
+        wizard["level"])
+    wizard["saving_throws"] = red_wizards_utils.calculate_wizard_saving_throws(
+        wizard["level"], wizard["ability_modifiers"])
+    wizard["spell_save_dc"] = red_wizards_utils.generate_spell_save_dc(
+        wizard["proficiency_bonus"], wizard["ability_modifiers"]["int_modifier"])
+    wizard["spell_attack_bonus"] = red_wizards_utils.generate_spell_attack_bonus(
+        wizard["proficiency_bonus"], wizard["ability_modifiers"]["int_modifier"])
+
+    if wizard["level"] <= 4:
+        level_category = "low_level"
+    elif 4 < wizard["level"] <= 13:
+        level_category = "mid_level"
+    else:
+        level_category = "high_level"
+
+    wizard["spell_list"] = red_wizards_utils.get_spell_list(
+        wizard["arcane_tradition"], level_category)
+
+
+    # Add skill bonuses
+    wizard["skills"] = {
+        "Arcana": red_wizards_utils.calculate_skill_bonus(
+            wizard["level"], "Arcana", wizard["ability_modifiers"], True),
+        "Deception": red_wizards_utils.calculate_skill_bonus(
+            wizard["level"], "Deception", wizard["ability_modifiers"], True),
+        "Insight": red_wizards_utils.calculate_skill_bonus(
+            wizard["level"], "Insight", wizard["ability_modifiers"], True),
+        "Stealth": red_wizards_utils.calculate_skill_bonus(
+            wizard["level"], "Stealth", wizard["ability_modifiers"], True),
+        "Passive_Perception": 10 + red_wizards_utils.calculate_skill_bonus(
+            wizard["level"], "Perception", wizard["ability_modifiers"], False)
+    }
+    wizard["languages"] = red_wizards_utils.generate_languages()
+
+    return wizard
+
+def generate_red_wizards(num_wizards, level=None):
     """
-    Generate Red Wizards of Thay with specified parameters and save them to a JSON file.
+    Generate Red Wizards of Thay one at a time.
 
     :param num_wizards: The number of Red Wizards to generate.
     :param level: The level of the Red Wizards. If not specified, a random level will be 
     generated for each wizard.
+    :return: A generator yielding a dictionary of attributes for each generated wizard.
     """
-    wizards = []
     for _ in range(num_wizards):
-        wizard = {}
-        wizard["name"] = red_wizards_utils.generate_thayan_name()
-        if level is None:
-            wizard["level"] = red_wizards_utils.generate_random_level()
-        else:
-            wizard["level"] = level
-        wizard["race"] = red_wizards_utils.generate_race()
-        wizard["living_status"] = red_wizards_utils.generate_living_status()
-        wizard["arcane_tradition"] = red_wizards_utils.generate_arcane_tradition()
-        if wizard["living_status"] == "living":
-            wizard["age"] = red_wizards_utils.generate_age()
-        wizard["alignment"] = red_wizards_utils.generate_alignment()
-        wizard["ability_scores"] = red_wizards_utils.generate_ability_scores(wizard["level"])
-        wizard["ability_modifiers"] = red_wizards_utils.generate_ability_modifiers(
-            wizard["ability_scores"])
-        wizard["armor_class"] = 10 + wizard["ability_modifiers"]["dex_modifier"]
-        wizard["hit_points"] = red_wizards_utils.calculate_hit_points(
-            wizard["level"], wizard["ability_scores"]["CON"])
-        wizard["proficiency_bonus"] = red_wizards_utils.calculate_proficiency_bonus(
-            wizard["level"])
-        wizard["saving_throws"] = red_wizards_utils.calculate_wizard_saving_throws(
-            wizard["level"], wizard["ability_modifiers"])
-        wizard["spell_save_dc"] = red_wizards_utils.generate_spell_save_dc(
-            wizard["proficiency_bonus"], wizard["ability_modifiers"]["int_modifier"])
-        wizard["spell_attack_bonus"] = red_wizards_utils.generate_spell_attack_bonus(
-            wizard["proficiency_bonus"], wizard["ability_modifiers"]["int_modifier"])
-
-        if wizard["level"] <= 4:
-            level_category = "low_level"
-        elif 4 < wizard["level"] <= 13:
-            level_category = "mid_level"
-        else:
-            level_category = "high_level"
-
-        wizard["spell_list"] = red_wizards_utils.get_spell_list(
-            wizard["arcane_tradition"], level_category)
-
-
-        # Add skill bonuses
-        wizard["skills"] = {
-            "Arcana": red_wizards_utils.calculate_skill_bonus(
-                wizard["level"], "Arcana", wizard["ability_modifiers"], True),
-            "Deception": red_wizards_utils.calculate_skill_bonus(
-                wizard["level"], "Deception", wizard["ability_modifiers"], True),
-            "Insight": red_wizards_utils.calculate_skill_bonus(
-                wizard["level"], "Insight", wizard["ability_modifiers"], True),
-            "Stealth": red_wizards_utils.calculate_skill_bonus(
-                wizard["level"], "Stealth", wizard["ability_modifiers"], True),
-            "Passive_Perception": 10 + red_wizards_utils.calculate_skill_bonus(
-                wizard["level"], "Perception", wizard["ability_modifiers"], False)
-        }
-        wizard["languages"] = red_wizards_utils.generate_languages()
-
-        wizards.append(wizard)
-
-    with open("red_wizards.json", "w", encoding="utf-8") as outfile:
-        json.dump(wizards, outfile, indent=2)
+        yield generate_wizard(level)
+
+def main(num_wizards, level=None, outputs=None, seed=None, cache=None):
+    """
+    Generate Red Wizards of Thay with specified parameters and save them to one or more
+    output files in a single generation pass.
+
+    :param num_wizards: The number of Red Wizards to generate.
+    :param level: The level of the Red Wizards. If not specified, a random level will be 
+    generated for each wizard.
+    :param outputs: A list of output specs (see red_wizard_sinks.parse_output_spec). Defaults
+    to writing red_wizards.json.
+    :param seed: The random seed to generate the wizards with. If not specified, every run
+    generates new wizards.
+    :param cache: A red_wizard_cache.RosterCache to serve and store seeded rosters. Outputs
+    found in the cache are restored instead of generated.
+    """
+    if not outputs:
+        outputs = [DEFAULT_OUTPUT]
+    pending = red_wizard_sinks.parse_output_specs(outputs)
+
+    key = None
+    if seed is not None and cache is not None:
+        key = red_wizard_cache.cache_key(num_wizards, level, seed)
+        pending = [(fmt, path) for fmt, path in pending if not cache.restore(key, fmt, path)]
+        if not pending:
+            return
+
+    if seed is not None:
+        random.seed(seed)
+
+    with red_wizard_sinks.open_outputs(pending) as sinks:
+        for wizard in generate_red_wizards(num_wizards, level):
+            sinks.write(wizard)
+
+    if key is not None:
+        for fmt, path in pending:
+            cache.store(key, fmt, path)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate random Red Wizards of Thay.")
@@ -98,5 +153,36 @@ if __name__ == "__main__":
     parser.add_argument(
         "level", type=int, choices=range(1, 21), 
         help="Character level (1-20)", nargs='?', default=None)
+    parser.add_argument(
+        "--out", action="append", dest="outputs", metavar="SPEC",
+        help="Output file, selected by extension or a 'format:' prefix "
+             "(json, jsonl, csv, html), e.g. roster.csv or html:dir/. "
+             f"May be repeated. Defaults to {DEFAULT_OUTPUT}.")
+    parser.add_argument(
+        "--seed", type=int, default=None,
+        help="Random seed, to generate the same wizards on every run. Seeded rosters are "
+             "cached and served from the cache on later runs.")
+    parser.add_argument(
+        "--cache-dir", default=red_wizard_cache.DEFAULT_CACHE_DIR,
+        help=f"Roster cache directory. Defaults to {red_wizard_cache.DEFAULT_CACHE_DIR}.")
+    parser.add_argument(
+        "--cache-max-bytes", type=int, default=red_wizard_cache.DEFAULT_MAX_BYTES,
+        help="Maximum size of the roster cache. Least recently used rosters are evicted first.")
+    parser.add_argument(
+        "--no-cache", action="store_true", help="Do not read or write the roster cache.")
+    parser.add_argument(
+        "--cache-stats", action="store_true",
+        help="Print the roster cache hit ratio and bytes saved after the run.")
     args = parser.parse_args()
-    main(args.num_wizards, args.level)
+    try:
+        red_wizard_sinks.parse_output_specs(args.outputs or [])
+    except ValueError as error:
+        parser.error(str(error))
+    roster_cache = None
+    if not args.no_cache:
+        roster_cache = red_wizard_cache.RosterCache(args.cache_dir, args.cache_max_bytes)
+    main(args.num_wizards, args.level, args.outputs, args.seed, roster_cache)
+    if args.cache_stats and roster_cache is not None:
+        stats = roster_cache.stats()
+        print(f"Cache hits: {stats['hits']}, misses: {stats['misses']}, "
+              f"hit ratio: {stats['hit_ratio']:.0%}, bytes saved: {stats['bytes_saved']}")
@@ -0,0 +1,326 @@
+"""
+red_wizard_sinks.py
+
+This module provides output sinks for the Red Wizard Generator. A sink receives generated
+wizards one at a time and writes them to a single output in a particular format, so that one
+generation pass can fan each wizard out to several outputs at once.
+
+Supported formats:
+- json: a JSON array, identical to the historical red_wizards.json output
+- jsonl: one JSON object per line
+- csv: one row per wizard, with nested attributes flattened into dotted column names
+- html: the red_wizard_template.html rendering
+
+Output specs are either a plain path, whose extension selects the format (e.g. "roster.csv"),
+or a "format:path" pair (e.g. "html:dir/"). A path ending in a separator, or naming an existing
+directory, receives a file named red_wizards.<format> inside that directory.
+
+Example usage:
+
+    from red_wizard_sinks import open_sinks
+
+    with open_sinks(["roster.jsonl", "roster.csv", "html:dir/"]) as sinks:
+        for wizard in wizards:
+            sinks.write(wizard)
+"""
+import csv
+import json
+import os
+import red_wizard_to_html
+
+# Size of the write buffer given to each sink's output file.
+BUFFER_SIZE = 1024 * 1024
+
+CSV_FIELDS = [
+    "name", "level", "race", "living_status", "arcane_tradition", "age", "alignment",
+    "ability_scores.STR", "ability_scores.DEX", "ability_scores.CON",
+    "ability_scores.INT", "ability_scores.WIS", "ability_scores.CHA",
+    "ability_modifiers.str_modifier", "ability_modifiers.dex_modifier",
+    "ability_modifiers.con_modifier", "ability_modifiers.int_modifier",
+    "ability_modifiers.wis_modifier", "ability_modifiers.cha_modifier",
+    "armor_class", "hit_points", "proficiency_bonus",
+    "saving_throws.INT", "saving_throws.WIS",
+    "spell_save_dc", "spell_attack_bonus",
+    # A plain "spell_list" value is the default list of a tradition without its own spells.
+    "spell_list", "spell_list.at_will", "spell_list.2_per_day", "spell_list.1_per_day",
+    "skills.Arcana", "skills.Deception", "skills.Insight", "skills.Stealth",
+    "skills.Passive_Perception",
+    "languages"
+]
+
+
+def flatten_wizard(wizard, prefix=""):
+    """
+    Flatten a wizard dictionary into a single level dictionary suitable for a CSV row.
+
+    Nested dictionaries are flattened into dotted keys (e.g. "ability_scores.STR") and lists
+    are joined into a single "; " separated string.
+
+    :param wizard: A dictionary containing a generated wizard's attributes.
+    :param prefix: The key prefix used for nested dictionaries, defaults to "".
+    :return: A flat dictionary of the wizard's attributes.
+    """
+    row = {}
+    for key, value in wizard.items():
+        column = f"{prefix}{key}"
+        if isinstance(value, dict):
+            row.update(flatten_wizard(value, f"{column}."))
+        elif isinstance(value, list):
+            row[column] = "; ".join(str(item) for item in value)
+        else:
+            row[column] = value
+    return row
+
+
+class WizardSink:
+    """
+    Base class for an output sink. Each sink owns its own buffered output file, which is opened
+    on the first write and moved into place once the sink is closed.
+    """
+
+    extension = None
+
+    def __init__(self, path):
+        self.path = path
+        self.outfile = None
+
+    def _open(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Write to a temporary file and move it into place on close, so that an existing output
+        # (which may be a hard link into the roster cache) is replaced rather than truncated.
+        if os.path.lexists(f"{self.path}.tmp"):
+            os.remove(f"{self.path}.tmp")
+        self.outfile = open(  # pylint: disable=consider-using-with
+            f"{self.path}.tmp", "w", encoding="utf-8", newline="", buffering=BUFFER_SIZE)
+        self.start()
+
+    def start(self):
+        """Write anything that precedes the first wizard."""
+
+    def write(self, wizard):
+        """
+        Write a single wizard to the sink.
+
+        :param wizard: A dictionary containing a generated wizard's attributes.
+        """
+        if self.outfile is None:
+            self._open()
+        self.write_wizard(wizard)
+
+    def write_wizard(self, wizard):
+        """Write a single wizard to the already opened output file."""
+        raise NotImplementedError
+
+    def finish(self):
+        """Write anything that follows the last wizard."""
+
+    def close(self):
+        """
+        Finish the output, close the sink's file and move it into place. If finishing fails, the
+        output is discarded and any existing file at the path is left untouched.
+        """
+        try:
+            if self.outfile is None:
+                self._open()
+            self.finish()
+            self.outfile.close()
+        except BaseException:
+            self.abort()
+            raise
+        os.replace(f"{self.path}.tmp", self.path)
+
+    def abort(self):
+        """Close the sink's file and discard it, leaving any existing file at the path as is."""
+        if self.outfile is not None:
+            self.outfile.close()
+        if os.path.lexists(f"{self.path}.tmp"):
+            os.remove(f"{self.path}.tmp")
+
+
+class JSONSink(WizardSink):
+    """Write wizards as a JSON array, matching json.dump(wizards, outfile, indent=2)."""
+
+    extension = "json"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.count = 0
+
+    def start(self):
+        self.outfile.write("[")
+
+    def write_wizard(self, wizard):
+        separator = ",\n" if self.count else "\n"
+        body = json.dumps(wizard, indent=2).replace("\n", "\n  ")
+        self.outfile.write(f"{separator}  {body}")
+        self.count += 1
+
+    def finish(self):
+        self.outfile.write("\n]" if self.count else "]")
+
+
+class JSONLSink(WizardSink):
+    """Write wizards as JSON Lines, one compact object per line."""
+
+    extension = "jsonl"
+
+    def write_wizard(self, wizard):
+        self.outfile.write(json.dumps(wizard))
+        self.outfile.write("\n")
+
+
+class CSVSink(WizardSink):
+    """
+    Write wizards as CSV rows, using the columns listed in CSV_FIELDS. A wizard attribute without
+    a column raises a ValueError rather than being dropped.
+    """
+
+    extension = "csv"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.writer = None
+
+    def start(self):
+        self.writer = csv.DictWriter(
+            self.outfile, fieldnames=CSV_FIELDS, restval="")
+        self.writer.writeheader()
+
+    def write_wizard(self, wizard):
+        self.writer.writerow(flatten_wizard(wizard))
+
+
+class HTMLSink(WizardSink):
+    """
+    Render wizards with red_wizard_template.html. The template needs the whole roster, so
+    wizards are collected and rendered once the sink is closed.
+    """
+
+    extension = "html"
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.wizards = []
+
+    def write_wizard(self, wizard):
+        self.wizards.append(wizard)
+
+    def finish(self):
+        red_wizard_to_html.render_wizards(self.wizards, self.outfile)
+
+
+SINKS = {sink.extension: sink for sink in (JSONSink, JSONLSink, CSVSink, HTMLSink)}
+
+
+def parse_output_spec(spec):
+    """
+    Parse an output spec into a format name and an output path.
+
+    :param spec: Either a path whose extension names the format (e.g. "roster.csv") or a
+        "format:path" pair (e.g. "html:dir/").
+    :return: A tuple of (format, path).
+    :raise ValueError: If the format is unknown or cannot be determined.
+    """
+    fmt, separator, path = spec.partition(":")
+    if not separator or fmt.lower() not in SINKS:
+        fmt, path = os.path.splitext(spec)[1].lstrip("."), spec
+    fmt = fmt.lower()
+    if fmt not in SINKS:
+        raise ValueError(
+            f"Cannot determine output format for {spec!r}; "
+            f"use one of {', '.join(SINKS)} as an extension or a 'format:' prefix")
+    if not path:
+        raise ValueError(f"Missing output path in {spec!r}")
+    if path.endswith(("/", os.sep)) or os.path.isdir(path):
+        path = os.path.join(path, f"red_wizards.{fmt}")
+    return fmt, path
+
+
+def parse_output_specs(specs):
+    """
+    Parse a list of output specs, checking that no two of them write to the same file.
+
+    :param specs: A list of output specs, see parse_output_spec.
+    :return: A list of (format, path) tuples.
+    :raise ValueError: If a spec is invalid or two specs resolve to the same path.
+    """
+    parsed = []
+    seen = {}
+    for spec in specs:
+        fmt, path = parse_output_spec(spec)
+        resolved = os.path.normcase(os.path.abspath(path))
+        if resolved in seen:
+            raise ValueError(f"Outputs {seen[resolved]!r} and {spec!r} both write to {path!r}")
+        seen[resolved] = spec
+        parsed.append((fmt, path))
+    return parsed
+
+
+class SinkGroup:
+    """
+    Fan each written wizard out to several sinks. Use as a context manager so that every sink
+    is closed, and its buffer flushed, once generation is finished.
+    """
+
+    def __init__(self, sinks):
+        self.sinks = list(sinks)
+
+    def write(self, wizard):
+        """
+        Write a single wizard to every sink in the group.
+
+        :param wizard: A dictionary containing a generated wizard's attributes.
+        """
+        for sink in self.sinks:
+            sink.write(wizard)
+
+    def close(self):
+        """
+        Close every sink in the group. Every sink is closed even if one of them fails, after
+        which the first error is raised.
+        """
+        error = None
+        for sink in self.sinks:
+            try:
+                sink.close()
+            except Exception as sink_error:  # pylint: disable=broad-except
+                error = error or sink_error
+        if error is not None:
+            raise error
+
+    def abort(self):
+        """Discard the output of every sink in the group, leaving existing files as they were."""
+        for sink in self.sinks:
+            sink.abort()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+def open_sinks(specs):
+    """
+    Create a SinkGroup for a list of output specs.
+
+    :param specs: A list of output specs, see parse_output_spec.
+    :return: A SinkGroup writing to each of the outputs.
+    :raise ValueError: If a spec is invalid or two specs resolve to the same path.
+    """
+    return open_outputs(parse_output_specs(specs))
+
+
+def open_outputs(outputs):
+    """
+    Create a SinkGroup for a list of already parsed outputs.
+
+    :param outputs: A list of (format, path) tuples, as returned by parse_output_specs.
+    :return: A SinkGroup writing to each of the outputs.
+    """
+    return SinkGroup(SINKS[fmt](path) for fmt, path in outputs)
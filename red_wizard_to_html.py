@@ -1,20 +1,82 @@
-"""A script to convert Red Wizard data from JSON to HTML using a Jinja2 template."""
+"""
+red_wizard_to_html.py
 
+This module renders Red Wizard data to HTML using the red_wizard_template.html Jinja2 template.
+Importing it has no side effects: Jinja2 is imported and the template loaded on the first call to
+render_wizards, and the template is reused by every later call.
+
+Example usage:
+
+    from red_wizard_to_html import render_wizards
+
+    # Render a list, or any iterable or generator, of wizard dictionaries
+    render_wizards(wizards, "red_wizards.html")
+
+Run as a script, it converts red_wizards.json to red_wizards.html:
+
+    python red_wizard_to_html.py
+"""
+import functools
 import json
 import os
-from jinja2 import Environment, FileSystemLoader
 
-# Set up Jinja2 template engine
-template_env = Environment(loader=FileSystemLoader(os.path.dirname(os.path.abspath(__file__))))
-template = template_env.get_template("red_wizard_template.html")
+TEMPLATE_NAME = "red_wizard_template.html"
+
+
+@functools.lru_cache(maxsize=None)
+def get_template():
+    """
+    Return the Red Wizard HTML template, loading it on first use.
+
+    :return: The compiled Jinja2 template.
+    """
+    # Imported here so that code paths which never render HTML do not pay for Jinja2.
+    from jinja2 import Environment, FileSystemLoader  # pylint: disable=import-outside-toplevel
+
+    template_env = Environment(
+        loader=FileSystemLoader(os.path.dirname(os.path.abspath(__file__))))
+    return template_env.get_template(TEMPLATE_NAME)
+
+
+def render_wizards(wizards, out):
+    """
+    Render Red Wizards to HTML.
+
+    The output is streamed to the destination as the template is rendered, rather than built up
+    as a single string first. A path is written through a temporary file that replaces it once
+    rendering succeeds, so a failed render leaves any existing file (which may be a hard link
+    into the roster cache) untouched.
+
+    :param wizards: An iterable or generator of dictionaries containing the wizards' attributes.
+    :param out: The path of the HTML file to write, or a writable text file object.
+    """
+    chunks = get_template().generate(wizards=wizards)
+    if hasattr(out, "write"):
+        out.writelines(chunks)
+        return
+
+    try:
+        with open(f"{out}.tmp", "w", encoding="utf-8") as outfile:
+            outfile.writelines(chunks)
+    except BaseException:
+        if os.path.lexists(f"{out}.tmp"):
+            os.remove(f"{out}.tmp")
+        raise
+    os.replace(f"{out}.tmp", out)
+
+
+def main(input_path="red_wizards.json", output_path="red_wizards.html"):
+    """
+    Convert a JSON file of Red Wizards to HTML.
+
+    :param input_path: The path of the JSON file to read, defaults to red_wizards.json.
+    :param output_path: The path of the HTML file to write, defaults to red_wizards.html.
+    """
+    with open(input_path, "r", encoding="utf-8") as infile:
+        wizards = json.load(infile)
 
-# Read the JSON data
-with open("red_wizards.json", "r", encoding="utf-8") as infile:
-    wizards = json.load(infile)
+    render_wizards(wizards, output_path)
 
-# Render the HTML output
-html_output = template.render(wizards=wizards)
 
-# Save the generated HTML to a file
-with open("red_wizards.html", "w", encoding="utf-8") as outfile:
-    outfile.write(html_output)
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+test_red_wizard_cache.py
+
+This module contains unit tests for the roster cache defined in the red_wizard_cache.py module.
+These tests check that cached artifacts are restored, that the least recently used rosters are
+evicted first and that the cache statistics are kept.
+
+To run the tests, simply execute the following command in the terminal:
+    python -m unittest test_red_wizard_cache
+"""
+import csv
+import json
+import os
+import random
+import tempfile
+import threading
+import unittest
+from unittest import mock
+import red_wizard_cache
+import red_wizard_generator
+from red_wizard_cache import RosterCache, cache_key
+
+class TestRosterCache(unittest.TestCase):
+    """
+    Test cases for the RosterCache class in the red_wizard_cache module.
+    """
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()  # pylint: disable=consider-using-with
+        self.cache_dir = os.path.join(self.temp_dir.name, "cache")
+        self.source = os.path.join(self.temp_dir.name, "source.json")
+        with open(self.source, "w", encoding="utf-8") as outfile:
+            outfile.write("[]")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_restore(self):
+        """
+        Test that a stored artifact is restored, and that a missing one is reported as a miss.
+        """
+        cache = RosterCache(self.cache_dir)
+        destination = os.path.join(self.temp_dir.name, "out", "roster.json")
+        self.assertFalse(cache.restore("key", "json", destination))
+
+        cache.store("key", "json", self.source)
+        self.assertTrue(cache.restore("key", "json", destination))
+        with open(destination, encoding="utf-8") as infile:
+            self.assertEqual(infile.read(), "[]")
+
+        stats = cache.stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (1, 1))
+        self.assertEqual(stats["hit_ratio"], 0.5)
+        self.assertEqual(stats["bytes_saved"], 2)
+
+    def test_changed_artifact_is_a_miss(self):
+        """
+        Test that an artifact changed through a hard linked output is not served, and that its
+        entry is evicted.
+        """
+        cache = RosterCache(self.cache_dir)
+        destination = os.path.join(self.temp_dir.name, "roster.json")
+        cache.store("key", "json", self.source)
+        self.assertTrue(cache.restore("key", "json", destination))
+
+        # Write to the restored output in place, as a plain open(path, "w") would.
+        with open(destination, "w", encoding="utf-8") as outfile:
+            outfile.write("[{}]")
+
+        self.assertFalse(cache.restore("key", "json", destination))
+        self.assertFalse(os.path.exists(os.path.join(self.cache_dir, "key")))
+
+    def test_key_changes_with_data_files(self):
+        """
+        Test that changing a file the roster depends on changes the cache key.
+        """
+        data_file = os.path.join(self.temp_dir.name, "values.json")
+        with open(data_file, "w", encoding="utf-8") as outfile:
+            outfile.write('{"first_names": ["Szass"]}')
+
+        with mock.patch.object(red_wizard_cache, "KEY_FILES", [data_file]):
+            key = cache_key(10, None, 42)
+            self.assertEqual(key, cache_key(10, None, 42))
+            self.assertNotEqual(key, cache_key(10, None, 43))
+            with open(data_file, "w", encoding="utf-8") as outfile:
+                outfile.write('{"first_names": ["Tam"]}')
+            self.assertNotEqual(key, cache_key(10, None, 42))
+
+    def test_evict_least_recently_used(self):
+        """
+        Test that the least recently used roster is evicted when the cache is over its size cap.
+        """
+        cache = RosterCache(self.cache_dir)
+        cache.store("old", "json", self.source)
+        entry_bytes = sum(artifact.stat().st_size
+                          for artifact in os.scandir(os.path.join(self.cache_dir, "old")))
+        cache.max_bytes = 2 * entry_bytes
+        cache.store("used", "json", self.source)
+        os.utime(os.path.join(self.cache_dir, "old"), (0, 0))
+        os.utime(os.path.join(self.cache_dir, "used"), (0, 1))
+        cache.restore("used", "json", os.path.join(self.temp_dir.name, "roster.json"))
+
+        cache.store("new", "json", self.source)
+        self.assertEqual(sorted(entry.name for entry in os.scandir(self.cache_dir)
+                                if entry.is_dir()), ["new", "used"])
+
+    def test_concurrent_runs(self):
+        """
+        Test that runs storing and restoring the same roster at the same time do not interfere.
+        """
+        destination = os.path.join(self.temp_dir.name, "roster.json")
+        errors = []
+
+        def run():
+            cache = RosterCache(self.cache_dir)
+            try:
+                for _ in range(20):
+                    cache.store("key", "json", self.source)
+                    cache.restore("key", "json", destination)
+            except Exception as error:  # pylint: disable=broad-except
+                errors.append(error)
+
+        threads = [threading.Thread(target=run) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertGreater(RosterCache(self.cache_dir).stats()["hits"], 0)
+        self.assertEqual(sorted(os.listdir(self.temp_dir.name)), ["cache", "roster.json",
+                                                                  "source.json"])
+
+class TestCachedGeneration(unittest.TestCase):
+    """
+    Test cases for seeded red_wizard_generator.main runs served from the roster cache.
+    """
+
+    def test_partial_hit(self):
+        """
+        Test that cached outputs are restored and only the missing formats are generated, with
+        the same wizards as an uncached run.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            cache = RosterCache(os.path.join(directory, "cache"))
+            json_path = os.path.join(directory, "roster.json")
+            csv_path = os.path.join(directory, "roster.csv")
+
+            red_wizard_generator.main(3, outputs=[json_path], seed=7, cache=cache)
+            red_wizard_generator.main(3, outputs=[json_path, csv_path], seed=7, cache=cache)
+            stats = cache.stats()
+            self.assertEqual((stats["hits"], stats["misses"]), (1, 2))
+
+            random.seed(7)
+            expected = list(red_wizard_generator.generate_red_wizards(3))
+            with open(json_path, encoding="utf-8") as infile:
+                self.assertEqual(json.load(infile), expected)
+            with open(csv_path, encoding="utf-8", newline="") as infile:
+                self.assertEqual([row["name"] for row in csv.DictReader(infile)],
+                                 [wizard["name"] for wizard in expected])
+
+            red_wizard_generator.main(3, outputs=[json_path, csv_path], seed=7, cache=cache)
+            self.assertEqual(cache.stats()["hits"], 3)
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,178 @@
+"""
+test_red_wizard_sinks.py
+
+This module contains unit tests for the output sinks defined in the red_wizard_sinks.py module.
+These tests check that output specs are parsed correctly and that every sink writes the
+generated wizards in its format.
+
+To run the tests, simply execute the following command in the terminal:
+    python -m unittest test_red_wizard_sinks
+"""
+import csv
+import json
+import os
+import tempfile
+import unittest
+import red_wizard_generator
+from red_wizard_sinks import flatten_wizard, open_sinks, parse_output_spec, parse_output_specs
+
+WIZARDS = [
+    {"name": "Xyralen Drakthor", "level": 3, "ability_scores": {"STR": 10, "INT": 17},
+     "languages": ["Common", "Thayan"]},
+    {"name": "Szass Tam", "level": 20, "ability_scores": {"STR": 8, "INT": 20},
+     "languages": ["Common", "Thayan", "Infernal"]},
+]
+
+class TestParseOutputSpec(unittest.TestCase):
+    """
+    Test cases for the parse_output_spec function in the red_wizard_sinks module.
+    """
+
+    def test_format_from_extension(self):
+        """
+        Test that the output format is taken from the file extension.
+        """
+        self.assertEqual(parse_output_spec("roster.JSONL"), ("jsonl", "roster.JSONL"))
+
+    def test_format_prefix(self):
+        """
+        Test that a "format:" prefix overrides the file extension.
+        """
+        self.assertEqual(parse_output_spec("csv:roster.txt"), ("csv", "roster.txt"))
+
+    def test_directory(self):
+        """
+        Test that a directory output receives a red_wizards.<format> file.
+        """
+        self.assertEqual(parse_output_spec("html:dir/"),
+                         ("html", os.path.join("dir/", "red_wizards.html")))
+
+    def test_unknown_format(self):
+        """
+        Test that an unknown output format raises a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            parse_output_spec("roster.txt")
+
+    def test_duplicate_paths(self):
+        """
+        Test that two specs writing to the same file raise a ValueError.
+        """
+        with self.assertRaises(ValueError):
+            parse_output_specs(["x.json", "json:x.json"])
+
+class TestSinks(unittest.TestCase):
+    """
+    Test cases for writing wizards to several sinks in a single pass.
+    """
+
+    def test_single_pass(self):
+        """
+        Test that every sink receives every wizard written to the group.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "roster.json")
+            jsonl_path = os.path.join(directory, "roster.jsonl")
+            csv_path = os.path.join(directory, "roster.csv")
+            with open_sinks([json_path, jsonl_path, csv_path]) as sinks:
+                for wizard in WIZARDS:
+                    sinks.write(wizard)
+
+            with open(json_path, encoding="utf-8") as infile:
+                self.assertEqual(infile.read(), json.dumps(WIZARDS, indent=2))
+            with open(jsonl_path, encoding="utf-8") as infile:
+                self.assertEqual([json.loads(line) for line in infile], WIZARDS)
+            with open(csv_path, encoding="utf-8", newline="") as infile:
+                rows = list(csv.DictReader(infile))
+            self.assertEqual([row["name"] for row in rows], ["Xyralen Drakthor", "Szass Tam"])
+            self.assertEqual(rows[1]["ability_scores.INT"], "20")
+
+    def test_html_sink(self):
+        """
+        Test that the HTML sink renders every wizard with the template.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            html_path = os.path.join(directory, "roster.html")
+            with open_sinks([html_path]) as sinks:
+                for wizard in red_wizard_generator.generate_red_wizards(2):
+                    sinks.write(wizard)
+            with open(html_path, encoding="utf-8") as infile:
+                self.assertEqual(infile.read().count('<div class="wizard">'), 2)
+
+    def test_main_directory_output(self):
+        """
+        Test that main writes to an existing directory given as a "format:" spec.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            red_wizard_generator.main(3, outputs=[f"jsonl:{directory}", f"csv:{directory}"])
+            with open(os.path.join(directory, "red_wizards.jsonl"), encoding="utf-8") as infile:
+                self.assertEqual(len(infile.readlines()), 3)
+            with open(os.path.join(directory, "red_wizards.csv"), encoding="utf-8",
+                      newline="") as infile:
+                self.assertEqual(len(list(csv.DictReader(infile))), 3)
+
+    def test_error_keeps_existing_output(self):
+        """
+        Test that an error during generation leaves existing outputs untouched and removes the
+        temporary files.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            json_path = os.path.join(directory, "roster.json")
+            csv_path = os.path.join(directory, "roster.csv")
+            with open(json_path, "w", encoding="utf-8") as outfile:
+                outfile.write("previous")
+
+            with self.assertRaises(RuntimeError):
+                with open_sinks([json_path, csv_path]) as sinks:
+                    sinks.write(WIZARDS[0])
+                    raise RuntimeError("generation failed")
+
+            with open(json_path, encoding="utf-8") as infile:
+                self.assertEqual(infile.read(), "previous")
+            self.assertEqual(os.listdir(directory), ["roster.json"])
+
+    def test_failing_sink_closes_others(self):
+        """
+        Test that a sink failing on close does not stop the other sinks from being written.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            html_path = os.path.join(directory, "roster.html")
+            jsonl_path = os.path.join(directory, "roster.jsonl")
+            # The template cannot render a wizard without ability modifiers.
+            with self.assertRaises(Exception):
+                with open_sinks([html_path, jsonl_path]) as sinks:
+                    sinks.write({"name": "Xyralen Drakthor", "level": 3})
+            self.assertEqual(os.listdir(directory), ["roster.jsonl"])
+
+    def test_csv_unknown_attribute(self):
+        """
+        Test that a wizard attribute without a CSV column raises rather than being dropped.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(ValueError):
+                with open_sinks([os.path.join(directory, "roster.csv")]) as sinks:
+                    sinks.write({"name": "Xyralen Drakthor", "unknown": 1})
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_csv_default_spell_list(self):
+        """
+        Test that a default spell list is written to the CSV rather than dropped.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            csv_path = os.path.join(directory, "roster.csv")
+            with open_sinks([csv_path]) as sinks:
+                sinks.write({"name": "Xyralen Drakthor", "spell_list": "Default Spell List"})
+            with open(csv_path, encoding="utf-8", newline="") as infile:
+                self.assertEqual(next(csv.DictReader(infile))["spell_list"],
+                                 "Default Spell List")
+
+    def test_flatten_wizard(self):
+        """
+        Test that nested attributes are flattened into dotted keys and lists are joined.
+        """
+        row = flatten_wizard(WIZARDS[0])
+        self.assertEqual(row["ability_scores.STR"], 10)
+        self.assertEqual(row["languages"], "Common; Thayan")
+
+if __name__ == "__main__":
+    unittest.main()
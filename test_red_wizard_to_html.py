@@ -0,0 +1,73 @@
+"""
+test_red_wizard_to_html.py
+
+This module contains unit tests for the render_wizards function defined in the
+red_wizard_to_html.py module.
+
+To run the tests, simply execute the following command in the terminal:
+    python -m unittest test_red_wizard_to_html
+"""
+import io
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+import red_wizard_to_html
+from red_wizard_generator import generate_red_wizards
+
+class TestRenderWizards(unittest.TestCase):
+    """
+    Test cases for the render_wizards function in the red_wizard_to_html module.
+    """
+
+    def test_render_generator(self):
+        """
+        Test that wizards from a generator are rendered to a file object.
+        """
+        wizards = list(generate_red_wizards(3))
+        out = io.StringIO()
+        red_wizard_to_html.render_wizards(iter(wizards), out)
+        html = out.getvalue()
+        self.assertEqual(html.count('<div class="wizard">'), 3)
+        for wizard in wizards:
+            self.assertIn(wizard["name"], html)
+
+    def test_render_to_path(self):
+        """
+        Test that wizards are rendered to a file path, and that the template is reused.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "red_wizards.html")
+            red_wizard_to_html.render_wizards([], path)
+            with open(path, encoding="utf-8") as infile:
+                self.assertIn("<title>Red Wizards of Thay</title>", infile.read())
+        self.assertIs(red_wizard_to_html.get_template(), red_wizard_to_html.get_template())
+
+    def test_render_error_keeps_existing_file(self):
+        """
+        Test that a failed render leaves the existing file untouched and no temporary file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "red_wizards.html")
+            with open(path, "w", encoding="utf-8") as outfile:
+                outfile.write("previous")
+            # The template cannot render a wizard without ability modifiers.
+            with self.assertRaises(Exception):
+                red_wizard_to_html.render_wizards([{"name": "Szass Tam", "level": 20}], path)
+            with open(path, encoding="utf-8") as infile:
+                self.assertEqual(infile.read(), "previous")
+            self.assertEqual(os.listdir(directory), ["red_wizards.html"])
+
+    def test_jinja_imported_lazily(self):
+        """
+        Test that importing the generator and this module does not import Jinja2.
+        """
+        subprocess.run(
+            [sys.executable, "-c",
+             "import red_wizard_generator, red_wizard_to_html, sys; "
+             "assert 'jinja2' not in sys.modules"],
+            check=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+
+if __name__ == "__main__":
+    unittest.main()